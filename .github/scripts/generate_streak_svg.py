@@ -1,154 +1,270 @@
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 import sys
 import os
-from datetime import datetime, date
-import svgwrite
+from datetime import datetime, date, timezone
 import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
+from string import Formatter
+from xml.sax.saxutils import escape
 
 # --- 1. API & Data Fetching ---
 
+# One keep-alive session for every GraphQL call, retrying transient
+# rate-limit/server errors with backoff. The queries are read-only, so POST
+# is safe to retry.
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=1,  # only ever talks to api.github.com
+    pool_maxsize=4,
+    max_retries=Retry(
+        total=5,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset({'POST'}),
+    ),
+))
+_SESSION.headers.update({
+    'User-Agent': 'Streak-Generator',
+    'Content-Type': 'application/json',
+    'Accept-Encoding': 'gzip',
+})
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+
+_USER_QUERY = """
+query($userName: String!) {
+  user(login: $userName) { createdAt }
+}
+"""
+
+# Several yearly windows are packed into one request as aliased
+# contributionsCollection fields (c0, c1, ...), each with its own from/to
+_CONTRIB_QUERY = """
+query($userName: String!, {params}) {{
+  user(login: $userName) {{
+{collections}
+  }}
+  rateLimit {{ cost remaining resetAt }}
+}}
+"""
+
+_COLLECTION_FIELD = """    c{i}: contributionsCollection(from: $from{i}, to: $to{i}) {{
+      contributionCalendar {{
+        totalContributions
+        weeks {{
+          contributionDays {{ date contributionCount }}
+        }}
+      }}
+    }}"""
+
+# Keep each request well inside GitHub's 10s GraphQL timeout
+YEARS_PER_QUERY = 3
+
+@lru_cache(maxsize=None)
+def _build_contrib_query(window_count):
+    params = ", ".join(f"$from{i}: DateTime!, $to{i}: DateTime!" for i in range(window_count))
+    collections = "\n".join(_COLLECTION_FIELD.format(i=i) for i in range(window_count))
+    return _CONTRIB_QUERY.format(params=params, collections=collections)
+
 def get_headers():
     token = os.getenv("GITHUB_TOKEN")
     if not token or len(token) < 10:
         raise ValueError("GITHUB_TOKEN missing or invalid!")
-    return {
-        'Authorization': f'Bearer {token}',
-        'User-Agent': 'Streak-Generator'
-    }
+    return {'Authorization': f'Bearer {token}'}
+
+def authorize_session():
+    """Validates GITHUB_TOKEN once and attaches it to the shared session."""
+    _SESSION.headers.update(get_headers())
+
+@lru_cache(maxsize=None)
+def _query_body_prefix(query):
+    # The query text is fixed per call site, so serialise it once and only
+    # encode the variables on each request
+    return orjson.dumps({'query': query})[:-1] + b',"variables":'
 
 def run_graphql_query(query, variables):
-    url = "https://api.github.com/graphql"
-    response = requests.post(url, json={'query': query, 'variables': variables}, headers=get_headers())
-    if response.status_code != 200:
-        raise Exception(f"HTTP {response.status_code}: {response.text}")
-    data = response.json()
+    body = _query_body_prefix(query) + orjson.dumps(variables) + b'}'
+    # Bounded connect/read timeouts so a hung API call can't stall the CI job.
+    # The read timeout sits above GitHub's own 10s limit: a slow batch should
+    # finish, not time out and be retried into the same wall
+    response = _SESSION.post(GRAPHQL_URL, data=body, timeout=(3.05, 15))
+    try:
+        response.raise_for_status()
+    except requests.HTTPError as e:
+        # Keep GitHub's explanation (e.g. for 401/403) in the error
+        raise Exception(f"HTTP {response.status_code}: {response.text}") from e
+    data = orjson.loads(response.content)
     if 'errors' in data:
-        raise Exception(f"GraphQL errors: {json.dumps(data['errors'], indent=2)}")
+        raise Exception(f"GraphQL errors: {orjson.dumps(data['errors'], option=orjson.OPT_INDENT_2).decode()}")
     return data
 
 def fetch_user_creation_date(username):
-    query = """
-    query($userName: String!) {
-      user(login: $userName) { createdAt }
-    }
-    """
-    data = run_graphql_query(query, {"userName": username})
+    data = run_graphql_query(_USER_QUERY, {"userName": username})
     user_data = data.get('data', {}).get('user')
     if not user_data:
         raise Exception(f"User '{username}' not found")
     return datetime.fromisoformat(user_data['createdAt'].replace('Z', '+00:00'))
 
-def fetch_contributions_for_year(username, year):
-    query = """
-    query($userName: String!, $from: DateTime!, $to: DateTime!) {
-      user(login: $userName) {
-        contributionsCollection(from: $from, to: $to) {
-          contributionCalendar {
-            totalContributions
-            weeks {
-              contributionDays { date contributionCount }
-            }
-          }
-        }
-      }
-    }
-    """
-    start_date = f"{year}-01-01T00:00:00Z"
-    end_date = f"{year}-12-31T23:59:59Z"
-    variables = {"userName": username, "from": start_date, "to": end_date}
-    data = run_graphql_query(query, variables)
-    return data['data']['user']['contributionsCollection']['contributionCalendar']
-
-def fetch_all_contributions(username):
+def fetch_contributions_for_ranges(username, windows):
+    """Fetches the contribution calendar for each (start, end) window in a single request."""
+    variables = {"userName": username}
+    for i, (start, end) in enumerate(windows):
+        variables[f"from{i}"] = start.strftime('%Y-%m-%dT%H:%M:%SZ')
+        variables[f"to{i}"] = end.strftime('%Y-%m-%dT%H:%M:%SZ')
+    data = run_graphql_query(_build_contrib_query(len(windows)), variables)
+    user = data['data']['user']
+    calendars = [user[f"c{i}"]['contributionCalendar'] for i in range(len(windows))]
+    return calendars, data['data']['rateLimit']
+
+# Below this many points left, wait for the window to reset before querying again
+RATE_LIMIT_THRESHOLD = 100
+
+def wait_for_rate_limit(rate_limit):
+    if rate_limit['remaining'] >= RATE_LIMIT_THRESHOLD:
+        return
+    reset_at = datetime.fromisoformat(rate_limit['resetAt'].replace('Z', '+00:00'))
+    wait = (reset_at - datetime.now(timezone.utc)).total_seconds()
+    if wait > 0:
+        print(f"Rate limit low ({rate_limit['remaining']} left), waiting {wait:.0f}s for reset...")
+        time.sleep(wait)
+
+def fetch_all_contributions(username, now):
     created_at = fetch_user_creation_date(username)
     start_year = created_at.year
-    current_year = datetime.now().year
+    current_year = now.year
     
     total_lifetime = 0
-    all_daily_counts = {}
+    # Dates of active days, parsed once here. Only presence matters for the
+    # streaks and the total comes from the API, so the counts are not kept
+    active_dates = []
+
+    # Stop the current year's window at now: the rest of the year is
+    # always empty and only adds payload
+    windows = [
+        (datetime(year, 1, 1, tzinfo=timezone.utc),
+         min(datetime(year, 12, 31, 23, 59, 59, tzinfo=timezone.utc), now))
+        for year in range(start_year, current_year + 1)
+    ]
 
     print(f"Fetching history from {start_year} to {current_year}...")
-    for year in range(start_year, current_year + 1):
-        calendar = fetch_contributions_for_year(username, year)
-        total_lifetime += calendar['totalContributions']
-        for week in calendar['weeks']:
-            for day in week['contributionDays']:
-                count = day['contributionCount']
-                if count > 0:
-                    all_daily_counts[day['date']] = count
-        time.sleep(0.1)
-
-    return all_daily_counts, total_lifetime, created_at
-
-def calculate_streaks(daily_counts):
-    if not daily_counts:
-        return 0, 0, datetime.now().strftime("%b %d, %Y")
-
-    dates = sorted(daily_counts.keys())
-    today = datetime.now().date()
-    
-    # Current Streak
-    current_streak = 0
-    last_contribution_date_str = dates[-1]
-    last_contribution_date = datetime.strptime(last_contribution_date_str, '%Y-%m-%d').date()
-    diff = (today - last_contribution_date).days
-    
-    if diff <= 1:
-        current_streak = 1
-        check_date = last_contribution_date
-        for i in range(len(dates) - 2, -1, -1):
-            prev_date = datetime.strptime(dates[i], '%Y-%m-%d').date()
-            if (check_date - prev_date).days == 1:
-                current_streak += 1
-                check_date = prev_date
-            else:
-                break
-    
-    # Longest Streak
+    for i in range(0, len(windows), YEARS_PER_QUERY):
+        calendars, rate_limit = fetch_contributions_for_ranges(username, windows[i:i + YEARS_PER_QUERY])
+        for calendar in calendars:
+            total_lifetime += calendar['totalContributions']
+            days = chain.from_iterable(week['contributionDays'] for week in calendar['weeks'])
+            active_dates.extend(date.fromisoformat(day['date']) for day in days if day['contributionCount'] > 0)
+        if i + YEARS_PER_QUERY < len(windows):
+            wait_for_rate_limit(rate_limit)
+            time.sleep(0.1)
+
+    # Windows normally arrive in order without overlap, but a boundary day
+    # can be reported twice; dedupe and sort once so the streak pass can
+    # rely on strictly increasing dates
+    return sorted(set(active_dates)), total_lifetime, created_at
+
+# Opt-in local cache (STREAK_CACHE=1) for repeated runs on the same day
+CACHE_DIR = '.cache'
+CACHE_TTL = 3600
+# Fingerprint of the contributions query, so data fetched with a different
+# query shape (e.g. after updating this script) is never reused
+_CACHE_QUERY_HASH = hashlib.blake2b((_CONTRIB_QUERY + _COLLECTION_FIELD).encode('utf-8'), digest_size=8).hexdigest()
+
+def _cache_path(username):
+    return os.path.join(CACHE_DIR, f"contrib-{username.lower()}.json")
+
+def load_cached_contributions(username, today):
+    """Returns (active_dates, total, created_at) from the local cache, or None if missing/expired."""
+    try:
+        with open(_cache_path(username), 'rb') as f:
+            cached = orjson.loads(f.read())
+        # Entries are keyed by UTC day (the calendar rolls over at midnight)
+        # and by the query that produced them
+        if (cached['query'] != _CACHE_QUERY_HASH
+                or cached['day'] != today.isoformat()
+                or cached['expires_at'] <= time.time()):
+            return None
+        active_dates = [date.fromisoformat(d) for d in cached['dates']]
+        return active_dates, cached['total'], datetime.fromisoformat(cached['created_at'])
+    except (OSError, ValueError, KeyError):
+        return None
+
+def save_cached_contributions(username, active_dates, total, created_at, today):
+    # GitHub's GraphQL endpoint has no ETags, so expire on a TTL instead
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(_cache_path(username), 'wb') as f:
+        f.write(orjson.dumps({
+            'query': _CACHE_QUERY_HASH,
+            'day': today.isoformat(),
+            'expires_at': time.time() + CACHE_TTL,
+            'dates': [d.isoformat() for d in active_dates],
+            'total': total,
+            'created_at': created_at.isoformat(),
+        }))
+
+def calculate_streaks(active_dates, today):
+    if not active_dates:
+        return 0, 0, today.strftime("%b %d, %Y")
+
+    # One forward pass over ordinal day numbers: runs of consecutive ordinals
+    # are only compared against the best so far when they end
+    days_iter = (d.toordinal() for d in active_dates)
     longest_streak = 0
-    current_count = 0
-    prev_date = None
-    longest_start_date = None
-    longest_end_date = None
-    temp_start = None
-
-    for date_str in dates:
-        date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
-        if prev_date and (date_obj - prev_date).days == 1:
-            current_count += 1
-        else:
-            current_count = 1
-            temp_start = date_obj
-            
-        if current_count > longest_streak:
-            longest_streak = current_count
-            longest_start_date = temp_start
-            longest_end_date = date_obj
-        prev_date = date_obj
-
-    if longest_start_date and longest_end_date:
-        s_fmt = longest_start_date.strftime("%b %d, %Y")
-        e_fmt = longest_end_date.strftime("%b %d, %Y")
-        longest_range_str = f"{s_fmt} - {e_fmt}"
+    longest_start_ord = longest_end_ord = None
+    run_start = prev_ord = next(days_iter)
+
+    for day_ord in days_iter:
+        # Adjacent windows can both report a boundary day; don't let the
+        # repeat read as a gap
+        if day_ord == prev_ord:
+            continue
+        if day_ord - prev_ord != 1:
+            if prev_ord - run_start + 1 > longest_streak:
+                longest_streak = prev_ord - run_start + 1
+                longest_start_ord, longest_end_ord = run_start, prev_ord
+            run_start = day_ord
+        prev_ord = day_ord
+
+    if prev_ord - run_start + 1 > longest_streak:
+        longest_streak = prev_ord - run_start + 1
+        longest_start_ord, longest_end_ord = run_start, prev_ord
+
+    # Current Streak: the final run, if it reaches today or yesterday
+    if today.toordinal() - prev_ord <= 1:
+        current_streak = prev_ord - run_start + 1
     else:
-        longest_range_str = "N/A"
+        current_streak = 0
+
+    s_fmt = date.fromordinal(longest_start_ord).strftime("%b %d, %Y")
+    e_fmt = date.fromordinal(longest_end_ord).strftime("%b %d, %Y")
+    longest_range_str = f"{s_fmt} - {e_fmt}"
 
     return current_streak, longest_streak, longest_range_str
 
 # --- 2. SVG Generation Logic ---
 
-def generate_svg(filename, theme, current, longest, total, longest_range, start_date_obj):
-    """Generates an SVG for a specific theme configuration."""
-    
-    formatted_start_date = start_date_obj.strftime("%b %d, %Y")
-    lifetime_label = f"{formatted_start_date} - Present"
-    
-    dwg = svgwrite.Drawing(filename, size=('495px', '195px'), viewBox='0 0 495 195')
+THEMES = {
+    "ocean": {
+        "light": {"bg": "#F8FAFC", "border": "#CBD5E1", "accent": "#3B82F6", "current": "#8B5CF6", "label": "#1D4ED8", "range": "#10B981", "fire": "#3B82F6"},
+        "dark":  {"bg": "#1A1B27", "border": "#E4E2E2", "accent": "#5B9EFF", "current": "#A78BFA", "label": "#5B9EFF", "range": "#34D399", "fire": "#5B9EFF"}
+    },
+    "forest": {
+        "light": {"bg": "#F8FAFC", "border": "#CBD5E1", "accent": "#10B981", "current": "#059669", "label": "#047857", "range": "#F59E0B", "fire": "#10B981"},
+        "dark":  {"bg": "#1A1B27", "border": "#E4E2E2", "accent": "#10B981", "current": "#34D399", "label": "#10B981", "range": "#FBBF24", "fire": "#10B981"}
+    },
+    "github": {
+        "light": {"bg": "#FFFFFF", "border": "#D0D7DE", "accent": "#0969DA", "current": "#0969DA", "label": "#57606A", "range": "#57606A", "fire": "#D95641"},
+        "dark":  {"bg": "#0D1117", "border": "#30363D", "accent": "#58A6FF", "current": "#58A6FF", "label": "#8B949E", "range": "#8B949E", "fire": "#D95641"}
+    }
+}
 
-    # CSS with Media Queries
-    css_styles = f"""
-        @keyframes currstreak {{
+# CSS with Media Queries, filled in with a theme's light/dark colors
+SVG_STYLE = """        @keyframes currstreak {{
             0% {{ font-size: 3px; opacity: 0.2; }}
             80% {{ font-size: 34px; opacity: 1; }}
             100% {{ font-size: 28px; opacity: 1; }}
@@ -159,111 +275,165 @@ def generate_svg(filename, theme, current, longest, total, longest_range, start_
         }}
         
         /* LIGHT MODE (Default) */
-        .bg {{ fill: {theme['light']['bg']}; stroke: {theme['light']['border']}; }}
-        .divider {{ stroke: {theme['light']['border']}; }}
-        .text-accent {{ fill: {theme['light']['accent']}; font-family: 'Segoe UI', Ubuntu, sans-serif; font-weight: 700; font-size: 28px; }}
-        .text-label {{ fill: {theme['light']['label']}; font-family: 'Segoe UI', Ubuntu, sans-serif; font-size: 14px; }}
-        .text-range {{ fill: {theme['light']['range']}; font-family: 'Segoe UI', Ubuntu, sans-serif; font-size: 12px; }}
-        .text-current {{ fill: {theme['light']['current']}; font-family: 'Segoe UI', Ubuntu, sans-serif; font-weight: 700; font-size: 28px; }}
-        .ring {{ stroke: {theme['light']['accent']}; }}
-        .fire {{ fill: {theme['light']['fire']}; }}
+        .bg {{ fill: {light[bg]}; stroke: {light[border]}; }}
+        .divider {{ stroke: {light[border]}; }}
+        .text-accent {{ fill: {light[accent]}; font-family: 'Segoe UI', Ubuntu, sans-serif; font-weight: 700; font-size: 28px; }}
+        .text-label {{ fill: {light[label]}; font-family: 'Segoe UI', Ubuntu, sans-serif; font-size: 14px; }}
+        .text-range {{ fill: {light[range]}; font-family: 'Segoe UI', Ubuntu, sans-serif; font-size: 12px; }}
+        .text-current {{ fill: {light[current]}; font-family: 'Segoe UI', Ubuntu, sans-serif; font-weight: 700; font-size: 28px; }}
+        .ring {{ stroke: {light[accent]}; }}
+        .fire {{ fill: {light[fire]}; }}
         
         /* DARK MODE */
         @media (prefers-color-scheme: dark) {{
-            .bg {{ fill: {theme['dark']['bg']}; stroke: {theme['dark']['border']}; }}
-            .divider {{ stroke: {theme['dark']['border']}; }}
-            .text-accent {{ fill: {theme['dark']['accent']}; }}
-            .text-label {{ fill: {theme['dark']['label']}; }}
-            .text-range {{ fill: {theme['dark']['range']}; }}
-            .text-current {{ fill: {theme['dark']['current']}; }}
-            .ring {{ stroke: {theme['dark']['accent']}; }}
-            .fire {{ fill: {theme['dark']['fire']}; }}
+            .bg {{ fill: {dark[bg]}; stroke: {dark[border]}; }}
+            .divider {{ stroke: {dark[border]}; }}
+            .text-accent {{ fill: {dark[accent]}; }}
+            .text-label {{ fill: {dark[label]}; }}
+            .text-range {{ fill: {dark[range]}; }}
+            .text-current {{ fill: {dark[current]}; }}
+            .ring {{ stroke: {dark[accent]}; }}
+            .fire {{ fill: {dark[fire]}; }}
         }}
-    """
-    dwg.defs.add(dwg.style(css_styles))
-
-    # Shapes
-    clip = dwg.clipPath(id='outer_rectangle')
-    clip.add(dwg.rect(insert=(0, 0), size=(495, 195), rx=4.5))
-    dwg.defs.add(clip)
-
-    mask = dwg.mask(id='mask_out_ring_behind_fire')
-    mask.add(dwg.rect(insert=(0, 0), size=(495, 195), fill='white'))
-    mask.add(dwg.ellipse(center=(247.5, 32), r=(13, 18), fill='black'))
-    dwg.defs.add(mask)
-
-    main = dwg.g(clip_path='url(#outer_rectangle)')
-    dwg.add(main)
-
-    # Elements
-    main.add(dwg.rect(insert=(0.5, 0.5), size=(494, 194), rx=4.5, class_="bg"))
-    main.add(dwg.line(start=(165, 28), end=(165, 170), stroke_width=1, class_="divider"))
-    main.add(dwg.line(start=(330, 28), end=(330, 170), stroke_width=1, class_="divider"))
-
-    # Text Elements
-    # Left
-    main.add(dwg.text(str(total), insert=(82.5, 80), text_anchor='middle', class_="text-accent", style='opacity: 0; animation: fadein 0.5s linear forwards 0.6s'))
-    main.add(dwg.text('Total Contributions', insert=(82.5, 116), text_anchor='middle', class_="text-label", style='opacity: 0; animation: fadein 0.5s linear forwards 0.7s'))
-    main.add(dwg.text(lifetime_label, insert=(82.5, 146), text_anchor='middle', class_="text-range", style='opacity: 0; animation: fadein 0.5s linear forwards 0.8s'))
-
-    # Center
-    main.add(dwg.text('Current Streak', insert=(247.5, 140), text_anchor='middle', class_="text-current", style='opacity: 0; animation: fadein 0.5s linear forwards 0.9s; font-size: 14px;'))
-    main.add(dwg.text(datetime.now().strftime("%b %d"), insert=(247.5, 166), text_anchor='middle', class_="text-range", style='opacity: 0; animation: fadein 0.5s linear forwards 0.9s'))
-    
-    # Ring & Flame
-    ring_g = dwg.g(mask='url(#mask_out_ring_behind_fire)')
-    ring_g.add(dwg.circle(center=(247.5, 71), r=40, fill='none', stroke_width=5, class_="ring", style='opacity: 0; animation: fadein 0.5s linear forwards 0.4s'))
-    main.add(ring_g)
-    
-    flame_g = dwg.g(transform='translate(247.5, 19.5)', style='opacity: 0; animation: fadein 0.5s linear forwards 0.6s')
-    flame_g.add(dwg.path(d="M -12 -0.5 L 15 -0.5 L 15 23.5 L -12 23.5 L -12 -0.5 Z", fill='none'))
-    flame_g.add(dwg.path(d="M 1.5 0.67 C 1.5 0.67 2.24 3.32 2.24 5.47 C 2.24 7.53 0.89 9.2 -1.17 9.2 C -3.23 9.2 -4.79 7.53 -4.79 5.47 L -4.76 5.11 C -6.78 7.51 -8 10.62 -8 13.99 C -8 18.41 -4.42 22 0 22 C 4.42 22 8 18.41 8 13.99 C 8 8.6 5.41 3.79 1.5 0.67 Z M -0.29 19 C -2.07 19 -3.51 17.6 -3.51 15.86 C -3.51 14.24 -2.46 13.1 -0.7 12.74 C 1.07 12.38 2.9 11.53 3.92 10.16 C 4.31 11.45 4.51 12.81 4.51 14.2 C 4.51 16.85 2.36 19 -0.29 19 Z", class_="fire"))
-    main.add(flame_g)
-    
-    main.add(dwg.text(str(current), insert=(247.5, 80), text_anchor='middle', class_="text-current", style='animation: currstreak 0.6s linear forwards'))
+"""
+
+# The card layout is fixed; only the theme colors and the stat values change
+# between runs, so the whole document is a single format string.
+SVG_TEMPLATE = """<?xml version="1.0" encoding="utf-8" ?>
+<svg baseProfile="full" height="195px" version="1.1" viewBox="0 0 495 195" width="495px" xmlns="http://www.w3.org/2000/svg" xmlns:ev="http://www.w3.org/2001/xml-events" xmlns:xlink="http://www.w3.org/1999/xlink"><defs><style type="text/css"><![CDATA[
+{style}    ]]></style><clipPath id="outer_rectangle"><rect x="0" y="0" width="495" height="195" rx="4.5" /></clipPath><mask id="mask_out_ring_behind_fire"><rect x="0" y="0" width="495" height="195" fill="white" /><ellipse cx="247.5" cy="32" rx="13" ry="18" fill="black" /></mask></defs>
+<g clip-path="url(#outer_rectangle)">
+<rect class="bg" x="0.5" y="0.5" width="494" height="194" rx="4.5" />
+<line class="divider" x1="165" y1="28" x2="165" y2="170" stroke-width="1" />
+<line class="divider" x1="330" y1="28" x2="330" y2="170" stroke-width="1" />
+<text class="text-accent" x="82.5" y="80" text-anchor="middle" style="opacity: 0; animation: fadein 0.5s linear forwards 0.6s">{total}</text>
+<text class="text-label" x="82.5" y="116" text-anchor="middle" style="opacity: 0; animation: fadein 0.5s linear forwards 0.7s">Total Contributions</text>
+<text class="text-range" x="82.5" y="146" text-anchor="middle" style="opacity: 0; animation: fadein 0.5s linear forwards 0.8s">{lifetime_label}</text>
+<text class="text-current" x="247.5" y="140" text-anchor="middle" style="opacity: 0; animation: fadein 0.5s linear forwards 0.9s; font-size: 14px;">Current Streak</text>
+<text class="text-range" x="247.5" y="166" text-anchor="middle" style="opacity: 0; animation: fadein 0.5s linear forwards 0.9s">{today_label}</text>
+<g mask="url(#mask_out_ring_behind_fire)"><circle class="ring" cx="247.5" cy="71" r="40" fill="none" stroke-width="5" style="opacity: 0; animation: fadein 0.5s linear forwards 0.4s" /></g>
+<g style="opacity: 0; animation: fadein 0.5s linear forwards 0.6s"><path class="fire" d="M 249 20.17 C 249 20.17 249.74 22.82 249.74 24.97 C 249.74 27.03 248.39 28.7 246.33 28.7 C 244.27 28.7 242.71 27.03 242.71 24.97 L 242.74 24.61 C 240.72 27.01 239.5 30.12 239.5 33.49 C 239.5 37.91 243.08 41.5 247.5 41.5 C 251.92 41.5 255.5 37.91 255.5 33.49 C 255.5 28.1 252.91 23.29 249 20.17 Z M 247.21 38.5 C 245.43 38.5 243.99 37.1 243.99 35.36 C 243.99 33.74 245.04 32.6 246.8 32.24 C 248.57 31.88 250.4 31.03 251.42 29.66 C 251.81 30.95 252.01 32.31 252.01 33.7 C 252.01 36.35 249.86 38.5 247.21 38.5 Z" /></g>
+<text class="text-current" x="247.5" y="80" text-anchor="middle" style="animation: currstreak 0.6s linear forwards">{current}</text>
+<text class="text-accent" x="412.5" y="80" text-anchor="middle" style="opacity: 0; animation: fadein 0.5s linear forwards 1.2s">{longest}</text>
+<text class="text-label" x="412.5" y="116" text-anchor="middle" style="opacity: 0; animation: fadein 0.5s linear forwards 1.3s">Longest Streak</text>
+<text class="text-range" x="412.5" y="146" text-anchor="middle" style="opacity: 0; animation: fadein 0.5s linear forwards 1.4s">{longest_range}</text>
+</g>
+</svg>
+"""
+
+def _build_template(theme):
+    """Bakes a theme's colors into SVG_TEMPLATE and splits it around the stat fields."""
+    style = SVG_STYLE.format(light=theme['light'], dark=theme['dark'])
+    # Re-escape the CSS braces so the result is still a valid format string
+    style = style.replace('{', '{{').replace('}', '}}')
+    template = SVG_TEMPLATE.replace('{style}', style)
+    # (encoded static chunk, following field name or None) pairs: rendering
+    # is then a join instead of re-parsing ~4 KB of format string each time
+    return [(literal.encode('utf-8'), field) for literal, field, _, _ in Formatter().parse(template)]
+
+# Themes are static, so each one is rendered to a template once at import
+_TEMPLATES = {key: _build_template(theme) for key, theme in THEMES.items()}
 
-    # Right
-    main.add(dwg.text(str(longest), insert=(412.5, 80), text_anchor='middle', class_="text-accent", style='opacity: 0; animation: fadein 0.5s linear forwards 1.2s'))
-    main.add(dwg.text('Longest Streak', insert=(412.5, 116), text_anchor='middle', class_="text-label", style='opacity: 0; animation: fadein 0.5s linear forwards 1.3s'))
-    main.add(dwg.text(longest_range, insert=(412.5, 146), text_anchor='middle', class_="text-range", style='opacity: 0; animation: fadein 0.5s linear forwards 1.4s'))
+def _write_file(path, data):
+    """Atomically replaces path with data, writing straight to the file descriptor."""
+    # Write next to the target and rename over it, so readers never see a half-written SVG
+    tmp_path = f"{path}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Don't leave a stray .tmp next to the cards on failure
+        os.unlink(tmp_path)
+        raise
 
-    dwg.save()
+def generate_svg(filename, theme_key, current, longest, total, longest_range, start_date_obj, today):
+    """Generates an SVG for a specific theme configuration."""
+    
+    formatted_start_date = start_date_obj.strftime("%b %d, %Y")
+    lifetime_label = f"{formatted_start_date} - Present"
+    
+    values = {
+        'current': current,
+        'longest': longest,
+        'total': total,
+        'lifetime_label': escape(lifetime_label),
+        'today_label': escape(today.strftime("%b %d")),
+        'longest_range': escape(longest_range),
+    }
+    parts = []
+    for literal, field in _TEMPLATES[theme_key]:
+        parts.append(literal)
+        if field is not None:
+            parts.append(str(values[field]).encode('utf-8'))
+    svg_bytes = b''.join(parts)
+    # Leave the file (and its mtime) alone when the card would come out identical
+    try:
+        with open(filename, 'rb') as f:
+            if f.read() == svg_bytes:
+                print(f"Unchanged: {filename}")
+                return
+    except OSError:
+        pass
+    _write_file(filename, svg_bytes)
     print(f"Saved: {filename}")
 
 # --- 3. Main Execution ---
 
-if __name__ == '__main__':
-    if len(sys.argv) < 2:
+def main(argv):
+    """Fetches a user's contributions once and renders the requested themes."""
+    if len(argv) < 2:
         raise ValueError("Provide username as first argument")
     
-    username = sys.argv[1].strip()
+    username = argv[1].strip()
     print(f"User: {username}")
     
-    # 1. Fetch Data ONCE
-    daily_counts, total, created_at_date = fetch_all_contributions(username)
-    current, longest, longest_range = calculate_streaks(daily_counts)
+    # Optional comma-separated theme list, e.g. "ocean,github" (default: all)
+    if len(argv) > 2:
+        theme_keys = [t.strip() for t in argv[2].split(',') if t.strip()]
+        if not theme_keys:
+            raise ValueError(f"No themes given. Available: {', '.join(THEMES)}")
+        unknown = [t for t in theme_keys if t not in THEMES]
+        if unknown:
+            raise ValueError(f"Unknown theme(s): {', '.join(unknown)}. Available: {', '.join(THEMES)}")
+    else:
+        theme_keys = list(THEMES)
     
-    # 2. Define Themes
-    themes_config = {
-        "ocean": {
-            "light": {"bg": "#F8FAFC", "border": "#CBD5E1", "accent": "#3B82F6", "current": "#8B5CF6", "label": "#1D4ED8", "range": "#10B981", "fire": "#3B82F6"},
-            "dark":  {"bg": "#1A1B27", "border": "#E4E2E2", "accent": "#5B9EFF", "current": "#A78BFA", "label": "#5B9EFF", "range": "#34D399", "fire": "#5B9EFF"}
-        },
-        "forest": {
-            "light": {"bg": "#F8FAFC", "border": "#CBD5E1", "accent": "#10B981", "current": "#059669", "label": "#047857", "range": "#F59E0B", "fire": "#10B981"},
-            "dark":  {"bg": "#1A1B27", "border": "#E4E2E2", "accent": "#10B981", "current": "#34D399", "label": "#10B981", "range": "#FBBF24", "fire": "#10B981"}
-        },
-        "github": {
-            "light": {"bg": "#FFFFFF", "border": "#D0D7DE", "accent": "#0969DA", "current": "#0969DA", "label": "#57606A", "range": "#57606A", "fire": "#D95641"},
-            "dark":  {"bg": "#0D1117", "border": "#30363D", "accent": "#58A6FF", "current": "#58A6FF", "label": "#8B949E", "range": "#8B949E", "fire": "#D95641"}
-        }
-    }
+    # Read the clock once, in UTC: the query window, the streaks and the
+    # card's date label all use this, so a run can't straddle midnight
+    now = datetime.now(timezone.utc)
+    today = now.date()
+    
+    # 1. Fetch Data ONCE (or reuse a cached copy from earlier today)
+    use_cache = os.getenv("STREAK_CACHE") == "1"
+    cached = load_cached_contributions(username, today) if use_cache else None
+    if cached:
+        print("Using cached contribution data")
+        active_dates, total, created_at_date = cached
+    else:
+        authorize_session()
+        active_dates, total, created_at_date = fetch_all_contributions(username, now)
+        if use_cache:
+            save_cached_contributions(username, active_dates, total, created_at_date, today)
+    current, longest, longest_range = calculate_streaks(active_dates, today)
     
-    # 3. Generate All Files
+    # 2. Generate All Files
     os.makedirs('assets/Streaks', exist_ok=True)
     
-    for key, theme in themes_config.items():
+    # Themes are independent and the write releases the GIL, so render them in parallel
+    def render_theme(key):
         filename = f"assets/Streaks/streak-{key}.svg"
-        generate_svg(filename, theme, current, longest, total, longest_range, created_at_date)
+        generate_svg(filename, key, current, longest, total, longest_range, created_at_date, today)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(render_theme, theme_keys))
         
     print("All themes generated successfully!")
+
+if __name__ == '__main__':
+    main(sys.argv)